@@ -21,14 +21,22 @@ import numpy as np
 
 import pycozmo
 
-# Last camera frame.
-last_frame = None
+KEY_ESC = 27
+# Key wait while there is no new frame to show. Keeps the window responsive without spinning.
+IDLE_WAIT_MS = 15
+
+# Last camera frame and its sequence number.
+last_frame = (None, 0)
 
 
 def on_camera_image(cli, image):
     """Convert PIL image to OpenCV image."""
     global last_frame
-    last_frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+    # View the raw RGB bytes directly. cvtColor() writes the only copy - a new array per frame, so the one the UI
+    # thread may still be showing is never overwritten.
+    rgb = np.frombuffer(image.tobytes(), dtype=np.uint8).reshape(image.height, image.width, 3)
+    bgr = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+    last_frame = (bgr, last_frame[1] + 1)
 
 
 def main():
@@ -47,38 +55,47 @@ def main():
         speed = 100  # mm/s
         head_step = 0.1  # radians
         lift_step = 5.0  # mm
+
+        def move_head(step):
+            nonlocal head_angle
+            head_angle = min(max(head_angle + step, pycozmo.robot.MIN_HEAD_ANGLE.radians),
+                             pycozmo.robot.MAX_HEAD_ANGLE.radians)
+            cli.set_head_angle(head_angle)
+
+        def move_lift(step):
+            nonlocal lift_height
+            lift_height = min(max(lift_height + step, pycozmo.robot.MIN_LIFT_HEIGHT.mm),
+                              pycozmo.robot.MAX_LIFT_HEIGHT.mm)
+            cli.set_lift_height(lift_height)
+
+        # Key dispatch table, built once instead of evaluated key by key on every loop iteration.
+        actions = {
+            ord('w'): lambda: cli.drive_wheels(speed, speed),
+            ord('s'): lambda: cli.drive_wheels(-speed, -speed),
+            ord('a'): lambda: cli.drive_wheels(-speed, speed),
+            ord('d'): lambda: cli.drive_wheels(speed, -speed),
+            ord('r'): lambda: move_head(head_step),
+            ord('f'): lambda: move_head(-head_step),
+            ord('t'): lambda: move_lift(lift_step),
+            ord('g'): lambda: move_lift(-lift_step),
+            ord(' '): cli.stop_all_motors,
+        }
+
+        shown_seq = 0
         while True:
-            if last_frame is not None:
-                cv2.imshow("Cozmo", last_frame)
-            key = cv2.waitKey(1) & 0xFF
-            if key == 27:  # ESC
+            frame, seq = last_frame
+            if seq != shown_seq:
+                cv2.imshow("Cozmo", frame)
+                shown_seq = seq
+                key = cv2.waitKey(1)
+            else:
+                key = cv2.waitKey(IDLE_WAIT_MS)
+            key &= 0xFF
+            if key == KEY_ESC:
                 break
-            elif key == ord('w'):
-                cli.drive_wheels(speed, speed)
-            elif key == ord('s'):
-                cli.drive_wheels(-speed, -speed)
-            elif key == ord('a'):
-                cli.drive_wheels(-speed, speed)
-            elif key == ord('d'):
-                cli.drive_wheels(speed, -speed)
-            elif key == ord('r'):
-                head_angle = min(head_angle + head_step,
-                                 pycozmo.robot.MAX_HEAD_ANGLE.radians)
-                cli.set_head_angle(head_angle)
-            elif key == ord('f'):
-                head_angle = max(head_angle - head_step,
-                                 pycozmo.robot.MIN_HEAD_ANGLE.radians)
-                cli.set_head_angle(head_angle)
-            elif key == ord('t'):
-                lift_height = min(lift_height + lift_step,
-                                  pycozmo.robot.MAX_LIFT_HEIGHT.mm)
-                cli.set_lift_height(lift_height)
-            elif key == ord('g'):
-                lift_height = max(lift_height - lift_step,
-                                  pycozmo.robot.MIN_LIFT_HEIGHT.mm)
-                cli.set_lift_height(lift_height)
-            elif key == ord(' '):
-                cli.stop_all_motors()
+            action = actions.get(key)
+            if action is not None:
+                action()
 
         cli.stop_all_motors()
         cv2.destroyAllWindows()
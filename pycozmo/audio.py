@@ -8,7 +8,7 @@ References:
 
 """
 
-from typing import List
+from typing import List, Union
 import struct
 import wave
 import time
@@ -19,12 +19,16 @@ from . import protocol_encoder
 
 __all__ = [
     "load_wav",
+    "load_pcm",
 ]
 
 
 MULAW_MAX = 0x7FFF
 MULAW_BIAS = 132
 
+# Bytes-like objects, accepted by memoryview().
+Buffer = Union[bytes, bytearray, memoryview]
+
 
 def load_wav(filename: str) -> List[protocol_encoder.OutputAudio]:
     """ Load a WAVE file into a list of OutputAudio packets. """
@@ -38,24 +42,39 @@ def load_wav(filename: str) -> List[protocol_encoder.OutputAudio]:
             raise ValueError('Invalid audio format, only 16 bit samples are supported, ' +
                              'with 22050Hz or 48000Hz frame rates.')
 
-        ratediv = 2 if framerate == 48000 else 1
-        channels = w.getnchannels()
-        pkts = []
-
-        while True:
-            frame_in = w.readframes(744 * ratediv)
-            if not frame_in:
-                break
-            frame_out = bytes_to_cozmo(frame_in, ratediv, channels)
-            pkt = protocol_encoder.OutputAudio(samples=frame_out)
-            pkts.append(pkt)
+        pkts = load_pcm(w.readframes(w.getnframes()), framerate, w.getnchannels())
 
     logger.debug("Loaded WAVE file in {:.02f} s.".format(time.perf_counter() - start_time))
 
     return pkts
 
 
-def bytes_to_cozmo(byte_string: bytes, rate_correction: int, channels: int) -> bytearray:
+def load_pcm(samples: Buffer, framerate: int = 22050, channels: int = 1) -> List[protocol_encoder.OutputAudio]:
+    """ Convert 16-bit PCM samples into a list of OutputAudio packets.
+
+    Samples can be given as bytes or any other contiguous buffer, like the data of an int16 numpy array.
+    """
+
+    if framerate != 22050 and framerate != 48000:
+        raise ValueError('Invalid audio format, only 22050Hz or 48000Hz frame rates are supported.')
+
+    data = memoryview(samples).cast("B")
+    if len(data) % (2 * channels):
+        raise ValueError('Invalid audio data, length must be a multiple of {} bytes.'.format(2 * channels))
+
+    ratediv = 2 if framerate == 48000 else 1
+    chunk_size = 744 * ratediv * channels * 2
+    pkts = []
+
+    for offset in range(0, len(data), chunk_size):
+        frame_out = bytes_to_cozmo(data[offset:offset + chunk_size], ratediv, channels)
+        pkt = protocol_encoder.OutputAudio(samples=frame_out)
+        pkts.append(pkt)
+
+    return pkts
+
+
+def bytes_to_cozmo(byte_string: Buffer, rate_correction: int, channels: int) -> bytearray:
     """ Convert a 744 sample, 16-bit audio frame into a U-law encoded frame. """
     out = bytearray(744)
     n = channels * rate_correction
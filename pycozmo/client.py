@@ -572,6 +572,11 @@ class Client(event.Dispatcher):
         pkts = audio.load_wav(fspec)
         self.anim_controller.play_audio(pkts)
 
+    def play_audio_pcm(self, samples: audio.Buffer, framerate: int = 22050, channels: int = 1) -> None:
+        """ Play 16-bit PCM samples from memory - bytes or a contiguous buffer, see audio.load_pcm(). """
+        pkts = audio.load_pcm(samples, framerate, channels)
+        self.anim_controller.play_audio(pkts)
+
     def activate_behavior(self, behavior):
         self.add_child_dispatcher(behavior)
         behavior.activate()
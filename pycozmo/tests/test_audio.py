@@ -0,0 +1,69 @@
+
+import unittest
+
+import numpy as np
+
+from pycozmo import audio
+
+
+class TestLoadPCM(unittest.TestCase):
+
+    @staticmethod
+    def _samples(count: int, channels: int = 1) -> np.ndarray:
+        t = np.arange(count * channels)
+        return (np.sin(t / 10.0) * 20000).astype(np.int16)
+
+    def test_packet_count(self):
+        pkts = audio.load_pcm(self._samples(744 * 3 + 1).tobytes())
+        self.assertEqual(len(pkts), 4)
+        for pkt in pkts:
+            self.assertEqual(len(pkt.samples), 744)
+
+    def test_numpy_buffer(self):
+        samples = self._samples(2000)
+        expected = [pkt.samples for pkt in audio.load_pcm(samples.tobytes())]
+        actual = [pkt.samples for pkt in audio.load_pcm(samples.data)]
+        self.assertEqual(expected, actual)
+
+    def test_invalid_framerate(self):
+        with self.assertRaises(ValueError):
+            audio.load_pcm(b"\x00\x00", framerate=44100)
+
+    def test_invalid_length(self):
+        with self.assertRaises(ValueError):
+            audio.load_pcm(b"\x00\x00\x00")
+        with self.assertRaises(ValueError):
+            audio.load_pcm(b"\x00\x00\x00\x00\x00\x00", channels=2)
+
+    @staticmethod
+    def _reference(samples: np.ndarray, ratediv: int, channels: int) -> list:
+        # Independent u-law reference: sign bit, 3-bit segment from the magnitude's bit length and 4-bit mantissa,
+        # offset by one as in Cozmo's encoding. Only the first channel of every ratediv-th frame is kept.
+        s = samples[::channels * ratediv].astype(np.int32)
+        magnitude = np.minimum(np.abs(s) + audio.MULAW_BIAS, audio.MULAW_MAX)
+        position = np.frexp(magnitude)[1] - 1
+        mantissa = (magnitude >> (position - 4)) & 0x0f
+        encoded = (np.where(s < 0, 0x80, 0) | ((position - 7) << 4) | mantissa) + 1
+        pkts = []
+        for offset in range(0, len(encoded), 744):
+            pkt = bytearray(744)
+            chunk = encoded[offset:offset + 744]
+            pkt[:len(chunk)] = chunk.astype(np.uint8).tobytes()
+            pkts.append(pkt)
+        return pkts
+
+    def test_reference_values(self):
+        self.assertEqual(self._reference(np.array([0, 1, -1, 100, -100, 1000, -1000]), 1, 1)[0][:7],
+                         bytes([1, 1, 129, 14, 142, 50, 178]))
+
+    def test_mono_22050(self):
+        samples = self._samples(5000)
+        actual = [pkt.samples for pkt in audio.load_pcm(samples.tobytes(), 22050, 1)]
+        self.assertEqual(len(actual), 7)
+        self.assertEqual(actual, self._reference(samples, 1, 1))
+
+    def test_stereo_48000(self):
+        samples = self._samples(5000, 2)
+        actual = [pkt.samples for pkt in audio.load_pcm(samples.tobytes(), 48000, 2)]
+        self.assertEqual(len(actual), 4)
+        self.assertEqual(actual, self._reference(samples, 2, 2))
@@ -5,6 +5,7 @@ Remote control web interface for Cozmo using pycozmo.
 Features:
 - Buttons/endpoints for the same actions as examples/rc_cli.py
 - Live camera feed over MJPEG at /stream
+- Optional low-bandwidth H.264 (fragmented MP4) camera feed at /stream.h264
 
 Usage:
     python examples/rc_web.py --host 0.0.0.0 --port 8080
@@ -13,6 +14,11 @@ Then open http://<your-ip>:8080 from another device on the network.
 
 Dependencies:
     pip install fastapi uvicorn[standard]
+
+Optional:
+    pip install simplejpeg    # libjpeg-turbo JPEG encoding, much faster than Pillow
+    pip install opencv-python # used for JPEG encoding when simplejpeg is not available
+    pip install av            # H.264 stream at /stream.h264
 """
 import sys
 from pathlib import Path
@@ -22,36 +28,304 @@ if __package__ is None:
 
 
 import argparse
+import asyncio
+import functools
+from fractions import Fraction
 import io
+import logging
+import multiprocessing
+from multiprocessing import shared_memory
+import queue
+import socket
+import socketserver
 import threading
 import time
-from typing import Optional
+from typing import Optional, Set, Tuple, Union
 
+import numpy as np
+from PIL import Image
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 import uvicorn
 
+try:
+    # noinspection PyPackageRequirements
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+try:
+    # noinspection PyPackageRequirements
+    import cv2
+except ImportError:
+    cv2 = None
+
+try:
+    # noinspection PyPackageRequirements
+    import av
+except ImportError:
+    av = None
+
 import pycozmo
 
 
 app = FastAPI(title="Cozmo RC Web")
 
+# MJPEG multipart framing. Only the Content-Length value changes per frame.
+_BOUNDARY = "frame"
+_BOUNDARY_PREFIX = b"--" + _BOUNDARY.encode() + b"\r\nContent-Type: image/jpeg\r\nContent-Length: "
+_HDR_END = b"\r\n\r\n"
+_TRAILER = b"\r\n"
+
+# Raw MJPEG server: response head sent once per connection, socket send buffer size (a couple of frames - a
+# larger buffer only queues up stale frames) and client I/O timeout in seconds.
+_RAW_STREAM_HEAD = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: multipart/x-mixed-replace; boundary=" + _BOUNDARY.encode() + b"\r\n"
+    b"Cache-Control: no-cache, no-store, must-revalidate, private\r\n"
+    b"Pragma: no-cache\r\n"
+    b"Expires: 0\r\n"
+    b"Connection: close\r\n"
+    b"\r\n"
+)
+_RAW_STREAM_SNDBUF = 128 * 1024
+_RAW_STREAM_TIMEOUT = 10.0
+
+# Constant control endpoint replies, built once instead of JSON-serialized per request.
+_OK_RESP = Response(b'{"ok":true}', media_type="application/json")
+_BAD_ACTION = Response(b'{"detail":"invalid action"}', status_code=400, media_type="application/json")
+_BAD_DIR = Response(b'{"detail":"invalid dir"}', status_code=400, media_type="application/json")
+
+# H.264 stream frame rate hint - the Cozmo camera delivers about 15 frames per second.
+_H264_RATE = 15
+
+# Seconds to wait for one frame from the encoder process, for the encoder process to exit when closed, and for the
+# encoder thread to finish on disconnect.
+_PROCESS_ENCODE_TIMEOUT = 3.0
+_PROCESS_EXIT_TIMEOUT = 1.0
+_ENCODER_JOIN_TIMEOUT = 5.0
+
+# Camera frame as delivered to viewers - encoded JPEG or raw HxWx3 RGB pixels.
+Frame = Union[bytes, np.ndarray]
+
+
+class JPEGEncoder:
+    """JPEG encoder using the fastest available library.
+
+    Scratch buffers are reused between frames, so an instance must not be shared between threads.
+    """
+
+    def __init__(self):
+        self._bio = io.BytesIO()
+        self._bgr: Optional[np.ndarray] = None
+
+    def encode(self, rgb: np.ndarray, quality: int) -> bytes:
+        """Encode an HxWx3 RGB uint8 array."""
+        # Lower quality reduces bytes-on-the-wire which helps latency.
+        if simplejpeg is not None:
+            return simplejpeg.encode_jpeg(rgb, quality=quality, colorspace="RGB", fastdct=True)
+        if cv2 is not None:
+            if self._bgr is None or self._bgr.shape != rgb.shape:
+                self._bgr = np.empty_like(rgb)
+            cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR, dst=self._bgr)
+            # Huffman table optimization costs an extra pass for a few percent of size - not worth it live.
+            params = [cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+            ok, enc = cv2.imencode(".jpg", self._bgr, params)
+            if not ok:
+                raise ValueError("JPEG encoding failed")
+            return enc.tobytes()
+        self._bio.seek(0)
+        self._bio.truncate(0)
+        Image.fromarray(rgb).save(self._bio, format="JPEG", quality=quality)
+        return self._bio.getvalue()
+
+    def close(self):
+        # Nothing to release - same interface as ProcessEncoder.
+        pass
+
+
+class EncoderProcessError(Exception):
+    """The encoder process exited or did not reply in time."""
+
+
+def _encode_worker(requests: multiprocessing.Queue, replies: multiprocessing.Queue):
+    """Encoder process main loop - encode frames stored in shared memory until a None request arrives.
+
+    Requests are (shared memory name, frame shape, quality) tuples. Replies are JPEG bytes or the exception raised.
+    """
+    encoder = JPEGEncoder()
+    shm: Optional[shared_memory.SharedMemory] = None
+    try:
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            shm_name, shape, quality = request
+            if shm is None or shm.name != shm_name:
+                if shm is not None:
+                    shm.close()
+                shm = shared_memory.SharedMemory(name=shm_name)
+            rgb = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+            try:
+                replies.put(encoder.encode(rgb, quality))
+            except Exception as e:
+                replies.put(e)
+            # The array must not outlive the block it maps.
+            del rgb
+    finally:
+        if shm is not None:
+            shm.close()
+
+
+class ProcessEncoder:
+    """JPEG encoder running in a separate process, so encoding does not compete with request handling for the GIL.
+
+    Frames are handed over through a shared memory block - only the encoded JPEG is pickled back.
+    """
+
+    def __init__(self):
+        ctx = multiprocessing.get_context("spawn")
+        self._requests = ctx.Queue()
+        self._replies = ctx.Queue()
+        self._process = ctx.Process(
+            target=_encode_worker, args=(self._requests, self._replies), name="JPEGEncoderProcess", daemon=True)
+        # Start the worker now rather than on the first frame, which is then encoded within the timeout.
+        self._process.start()
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._shm_array: Optional[np.ndarray] = None
+
+    def encode(self, rgb: np.ndarray, quality: int) -> bytes:
+        if not self._process.is_alive():
+            raise EncoderProcessError("exited with code {}".format(self._process.exitcode))
+        if self._shm_array is None or self._shm_array.shape != rgb.shape:
+            self._release_shm()
+            self._shm = shared_memory.SharedMemory(create=True, size=rgb.nbytes)
+            self._shm_array = np.ndarray(rgb.shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._shm_array[...] = rgb
+        self._requests.put((self._shm.name, rgb.shape, quality))
+        try:
+            reply = self._replies.get(timeout=_PROCESS_ENCODE_TIMEOUT)
+        except queue.Empty:
+            raise EncoderProcessError("no reply in {} s".format(_PROCESS_ENCODE_TIMEOUT)) from None
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    def close(self):
+        # Do not wait indefinitely for a hung worker - it would block disconnect() and interpreter exit.
+        self._requests.put(None)
+        self._process.join(_PROCESS_EXIT_TIMEOUT)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join(_PROCESS_EXIT_TIMEOUT)
+        for q in (self._requests, self._replies):
+            q.close()
+            q.cancel_join_thread()
+        self._release_shm()
+
+    def _release_shm(self):
+        if self._shm is not None:
+            self._shm_array = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+class FrameSlot:
+    """Single-frame mailbox. A new frame (JPEG bytes or RGB array) replaces an unread one so viewers
+    always get the freshest one."""
+
+    def __init__(self):
+        self._queue: "queue.Queue[Frame]" = queue.Queue(maxsize=1)
+
+    def put(self, frame: Frame):
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            # Drop the stale frame. There is a single producer, so the slot stays free for the new one.
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._queue.put_nowait(frame)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Frame]:
+        """Wait for the next frame. Returns None on timeout."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncFrameSlot:
+    """FrameSlot counterpart for asyncio consumers. put() may be called from any thread."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._event = asyncio.Event()
+        self._frame: Optional[Frame] = None
+
+    def put(self, frame: Frame):
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, frame)
+        except RuntimeError:
+            # Event loop already closed - the viewer is going away.
+            pass
+
+    def _deliver(self, frame: Frame):
+        # Runs on the event loop, so replacing an unread frame needs no locking.
+        self._frame = frame
+        self._event.set()
+
+    async def get(self) -> Frame:
+        await self._event.wait()
+        self._event.clear()
+        return self._frame
+
+
+ViewerSlot = Union[FrameSlot, AsyncFrameSlot]
+
 
 class RobotController:
     """Manage pycozmo client connection and expose control helpers."""
 
-    def __init__(self, color_camera: bool = True, jpeg_quality: int = 70):
+    def __init__(
+        self,
+        color_camera: bool = True,
+        jpeg_quality: int = 70,
+        encode_process: bool = False,
+        max_fps: float = 0.0,
+        max_width: int = 0,
+    ):
         self.cli: Optional[pycozmo.Client] = None
-        self._lock = threading.RLock()
+        # Guards connect()/disconnect() only. Controls read self.cli once, without locking.
+        self._conn_lock = threading.RLock()
         self._connected = False
         self._head_angle = None
         self._lift_height = None
         self._color_camera = color_camera
         self._jpeg_quality = max(1, min(95, int(jpeg_quality)))
-
-        # Camera state
-        self._last_jpeg = None  # bytes
-        self._jpeg_lock = threading.Lock()
+        self._encode_process = encode_process
+        # Server-side frame rate and resolution limits. 0 means unlimited.
+        self._min_frame_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self._max_width = max(0, int(max_width))
+        self._next_frame_ts = 0.0
+
+        # Camera state: one single-frame slot per connected viewer - JPEG for /stream, raw RGB for /stream.h264
+        self._viewers: Set[ViewerSlot] = set()
+        self._raw_viewers: Set[ViewerSlot] = set()
+        self._viewers_lock = threading.Lock()
+        # Latest raw camera image waiting for the encoder thread
+        self._raw_slot = None
+        self._raw_lock = threading.Lock()
+        self._raw_event = threading.Event()
+        self._enc_stop = threading.Event()
+        self._camera_handler = None
+        self._enc_thread: Optional[threading.Thread] = None
+        self._encoder: Union[JPEGEncoder, ProcessEncoder] = JPEGEncoder()
+        self._frame_size = None  # (width, height) of the last camera image
+        self._frame_shape = None  # matching (height, width, 3) array shape
 
         # Motion params (match rc_cli defaults)
         self.speed_mmps = 100
@@ -60,24 +334,100 @@ class RobotController:
 
     # --- Camera handling ---
     def _on_camera_image(self, _cli, image):
-        # image is a PIL.Image object. Encode to JPEG bytes.
+        # Runs on the pycozmo receive thread. Hand the frame over to the encoder thread and return,
+        # replacing a frame that has not been picked up yet.
+        if not self._viewers and not self._raw_viewers:
+            return
+        now = time.monotonic()
+        if now < self._next_frame_ts:
+            return
+        # Advance the deadline by whole intervals rather than from the accepted frame, so that camera frame jitter
+        # does not halve the rate. Do not let it fall behind, to avoid a burst after a pause.
+        interval = self._min_frame_interval
+        self._next_frame_ts = max(self._next_frame_ts + interval, now - interval)
+        with self._raw_lock:
+            self._raw_slot = image
+        self._raw_event.set()
+
+    def _encode_loop(self):
+        while True:
+            self._raw_event.wait()
+            if self._enc_stop.is_set():
+                break
+            with self._raw_lock:
+                image, self._raw_slot = self._raw_slot, None
+                self._raw_event.clear()
+            if image is None:
+                continue
+            try:
+                rgb = self._prepare_frame(image)
+            except Exception:
+                continue
+            with self._viewers_lock:
+                viewers = list(self._viewers)
+                raw_viewers = list(self._raw_viewers)
+            for slot in raw_viewers:
+                slot.put(rgb)
+            if not viewers:
+                continue
+            data = self._encode_jpeg(rgb)
+            if data is None:
+                continue
+            for slot in viewers:
+                slot.put(data)
+
+    def _image_array(self, image) -> np.ndarray:
+        # Read-only view over the raw RGB bytes - no pixel copy beyond tobytes().
+        if image.size != self._frame_size:
+            self._frame_size = image.size
+            self._frame_shape = (image.height, image.width, 3)
+        return np.frombuffer(image.tobytes(), dtype=np.uint8).reshape(self._frame_shape)
+
+    def _prepare_frame(self, image) -> np.ndarray:
+        # image is an RGB PIL.Image object.
+        if 0 < self._max_width < image.width:
+            height = max(1, round(image.height * self._max_width / image.width))
+            image = image.resize((self._max_width, height), Image.BILINEAR)
+        return self._image_array(image)
+
+    def _encode_jpeg(self, rgb: np.ndarray) -> Optional[bytes]:
         try:
-            bio = io.BytesIO()
-            # Lower quality reduces bytes-on-the-wire which helps latency
-            image.save(bio, format="JPEG", quality=self._jpeg_quality)
-            data = bio.getvalue()
+            return self._encoder.encode(rgb, self._jpeg_quality)
+        except EncoderProcessError as e:
+            # Replies from a dead or hung worker can no longer be matched to frames - keep streaming with in-thread
+            # encoding.
+            logging.warning("JPEG encoder process failed ({}). Falling back to in-thread encoding.".format(e))
+            self._encoder.close()
+            self._encoder = JPEGEncoder()
+            return self._encode_jpeg(rgb)
         except Exception:
-            return
-        with self._jpeg_lock:
-            self._last_jpeg = data
-
-    def get_last_jpeg(self) -> Optional[bytes]:
-        with self._jpeg_lock:
-            return self._last_jpeg
+            return None
+
+    def add_viewer(self, slot: Optional[ViewerSlot] = None) -> ViewerSlot:
+        """Register a slot that receives every newly encoded JPEG. A FrameSlot is created by default."""
+        if slot is None:
+            slot = FrameSlot()
+        with self._viewers_lock:
+            self._viewers.add(slot)
+        return slot
+
+    def add_raw_viewer(self, slot: Optional[ViewerSlot] = None) -> ViewerSlot:
+        """Register a slot that receives every new camera frame as an HxWx3 RGB array, before JPEG encoding.
+        A FrameSlot is created by default."""
+        if slot is None:
+            slot = FrameSlot()
+        with self._viewers_lock:
+            self._raw_viewers.add(slot)
+        return slot
+
+    def remove_viewer(self, slot: ViewerSlot):
+        with self._viewers_lock:
+            self._viewers.discard(slot)
+            self._raw_viewers.discard(slot)
 
     # --- Connection lifecycle ---
     def connect(self):
-        with self._lock:
+        with self._conn_lock:
             if self._connected:
                 return
             # Create and connect client
@@ -95,92 +445,198 @@ class RobotController:
             self._head_angle = angle
             self._lift_height = self.cli.lift_position.height.mm
 
-            # Enable camera and register handler
+            # Start the JPEG encoder, then enable camera and register handler
+            if self._encode_process:
+                self._encoder = ProcessEncoder()
+            self._enc_stop.clear()
+            self._enc_thread = threading.Thread(target=self._encode_loop, name="JPEGEncoder", daemon=True)
+            self._enc_thread.start()
             self.cli.enable_camera(enable=True, color=self._color_camera)
-            self.cli.add_handler(
+            self._camera_handler = self.cli.add_handler(
                 pycozmo.event.EvtNewRawCameraImage, self._on_camera_image
             )
 
             self._connected = True
 
     def disconnect(self):
-        with self._lock:
+        with self._conn_lock:
             if not self._connected or not self.cli:
                 return
+            # Detach the client first so that controls stop using it before it is torn down.
+            cli = self.cli
+            self.cli = None
+            cli.del_handler(pycozmo.event.EvtNewRawCameraImage, self._camera_handler)
+            self._camera_handler = None
             try:
-                self.cli.stop_all_motors()
+                cli.stop_all_motors()
             except Exception:
                 pass
             try:
-                self.cli.disconnect()
+                cli.disconnect()
             except Exception:
                 pass
             try:
-                self.cli.stop()
+                cli.stop()
             except Exception:
                 pass
+            self._enc_stop.set()
+            self._raw_event.set()
+            self._enc_thread.join(_ENCODER_JOIN_TIMEOUT)
+            if self._enc_thread.is_alive():
+                logging.warning("JPEG encoder thread did not stop within {} s.".format(_ENCODER_JOIN_TIMEOUT))
+            self._enc_thread = None
+            with self._raw_lock:
+                self._raw_slot = None
+            self._encoder.close()
+            self._encoder = JPEGEncoder()
             self._connected = False
-            self.cli = None
 
     # --- Controls (mirror rc_cli.py) ---
     def drive(self, left_mmps: int, right_mmps: int):
-        with self._lock:
-            if not self.cli:
-                return
-            self.cli.drive_wheels(left_mmps, right_mmps)
+        cli = self.cli
+        if cli is None:
+            return
+        cli.drive_wheels(left_mmps, right_mmps)
 
     def stop(self):
-        with self._lock:
-            if not self.cli:
-                return
-            self.cli.stop_all_motors()
+        cli = self.cli
+        if cli is None:
+            return
+        cli.stop_all_motors()
 
     def head_up(self):
-        with self._lock:
-            if not self.cli:
-                return
-            new_angle = min(
-                (self._head_angle or 0) + self.head_step_rad,
-                pycozmo.robot.MAX_HEAD_ANGLE.radians,
-            )
-            self.cli.set_head_angle(new_angle)
-            self._head_angle = new_angle
+        cli = self.cli
+        if cli is None:
+            return
+        new_angle = min(
+            (self._head_angle or 0) + self.head_step_rad,
+            pycozmo.robot.MAX_HEAD_ANGLE.radians,
+        )
+        cli.set_head_angle(new_angle)
+        self._head_angle = new_angle
 
     def head_down(self):
-        with self._lock:
-            if not self.cli:
-                return
-            new_angle = max(
-                (self._head_angle or 0) - self.head_step_rad,
-                pycozmo.robot.MIN_HEAD_ANGLE.radians,
-            )
-            self.cli.set_head_angle(new_angle)
-            self._head_angle = new_angle
+        cli = self.cli
+        if cli is None:
+            return
+        new_angle = max(
+            (self._head_angle or 0) - self.head_step_rad,
+            pycozmo.robot.MIN_HEAD_ANGLE.radians,
+        )
+        cli.set_head_angle(new_angle)
+        self._head_angle = new_angle
 
     def lift_up(self):
-        with self._lock:
-            if not self.cli:
-                return
-            current = self._lift_height or 0.0
-            new_height = min(
-                current + self.lift_step_mm, pycozmo.robot.MAX_LIFT_HEIGHT.mm
-            )
-            self.cli.set_lift_height(new_height)
-            self._lift_height = new_height
+        cli = self.cli
+        if cli is None:
+            return
+        current = self._lift_height or 0.0
+        new_height = min(
+            current + self.lift_step_mm, pycozmo.robot.MAX_LIFT_HEIGHT.mm
+        )
+        cli.set_lift_height(new_height)
+        self._lift_height = new_height
 
     def lift_down(self):
-        with self._lock:
-            if not self.cli:
-                return
-            current = self._lift_height or 0.0
-            new_height = max(
-                current - self.lift_step_mm, pycozmo.robot.MIN_LIFT_HEIGHT.mm
-            )
-            self.cli.set_lift_height(new_height)
-            self._lift_height = new_height
+        cli = self.cli
+        if cli is None:
+            return
+        current = self._lift_height or 0.0
+        new_height = max(
+            current - self.lift_step_mm, pycozmo.robot.MIN_LIFT_HEIGHT.mm
+        )
+        cli.set_lift_height(new_height)
+        self._lift_height = new_height
+
+
+def _send_part(sock: socket.socket, frame: bytes):
+    """Write one MJPEG part - header, JPEG and trailer - with gather I/O, in a single sendmsg() call when the socket
+    accepts it all at once."""
+    buffers = [_BOUNDARY_PREFIX + str(len(frame)).encode() + _HDR_END, memoryview(frame), _TRAILER]
+    if not hasattr(sock, "sendmsg"):
+        # No sendmsg() on Windows.
+        sock.sendall(b"".join(buffers))
+        return
+    while buffers:
+        sent = sock.sendmsg(buffers)
+        # Drop fully sent buffers and trim a partially sent one.
+        while buffers and sent >= len(buffers[0]):
+            sent -= len(buffers[0])
+            buffers.pop(0)
+        if sent:
+            buffers[0] = memoryview(buffers[0])[sent:]
+
+
+class _MJPEGHandler(socketserver.BaseRequestHandler):
+    server: "MJPEGServer"
+
+    def setup(self):
+        self.request.settimeout(_RAW_STREAM_TIMEOUT)
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.request.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _RAW_STREAM_SNDBUF)
+
+    def handle(self):
+        sock = self.request
+        try:
+            # Read and ignore the request head - every path gets the stream.
+            head = b""
+            while b"\r\n\r\n" not in head and len(head) < 8192:
+                data = sock.recv(1024)
+                if not data:
+                    return
+                head += data
+            sock.sendall(_RAW_STREAM_HEAD)
+        except OSError:
+            return
+        slot = FrameSlot()
+        self.server.controller.add_viewer(slot)
+        try:
+            while self.server.running:
+                frame = slot.get(timeout=1.0)
+                # None on timeout. Viewer slots only ever receive JPEG bytes.
+                if not isinstance(frame, bytes):
+                    continue
+                _send_part(sock, frame)
+        except OSError:
+            # Client went away.
+            pass
+        finally:
+            self.server.controller.remove_viewer(slot)
+
+
+class MJPEGServer(socketserver.ThreadingTCPServer):
+    """Standalone MJPEG server writing frames straight to client sockets, bypassing the ASGI stack."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int], robot_controller: RobotController):
+        super().__init__(address, _MJPEGHandler)
+        self.controller = robot_controller
+        self.running = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
 
 
 controller = RobotController(color_camera=True)
+# Optional raw MJPEG server, started by main() with --raw-stream-port.
+mjpeg_server: Optional[MJPEGServer] = None
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -227,12 +683,10 @@ def index():
       <button onclick="post('/api/lift', { dir: 'down' })">Lift Down</button>
     </div>
     <script>
-      async function post(path, body) {
-        const res = await fetch(path, {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: body ? JSON.stringify(body) : null,
-        });
+      async function post(path, params) {
+        // Parameters travel in the query string - no request body to parse on the server.
+        const query = params ? '?' + new URLSearchParams(params) : '';
+        const res = await fetch(path + query, { method: 'POST' });
         return res.json().catch(() => ({}));
       }
       async function drive(action) {
@@ -259,15 +713,11 @@ def api_status():
 
 @app.post("/api/drive")
 async def api_drive(request: Request):
-    data = {}
-    try:
-        data = await request.json()
-    except Exception:
-        data = {}
-    action = str(data.get("action") or "").lower()
+    params = request.query_params
+    action = params.get("action", "").lower()
     try:
-        speed = int(data.get("speed") if data.get("speed") is not None else controller.speed_mmps)
-    except Exception:
+        speed = int(params.get("speed", controller.speed_mmps))
+    except ValueError:
         speed = controller.speed_mmps
     controller.speed_mmps = max(0, min(250, speed))
 
@@ -280,68 +730,59 @@ async def api_drive(request: Request):
     elif action == "right":
         controller.drive(controller.speed_mmps, -controller.speed_mmps)
     else:
-        raise HTTPException(status_code=400, detail="invalid action")
-    return {"ok": True}
+        return _BAD_ACTION
+    return _OK_RESP
 
 
 @app.post("/api/head")
 async def api_head(request: Request):
-    try:
-        data = await request.json()
-    except Exception:
-        data = {}
-    direction = str(data.get("dir") or "").lower()
+    direction = request.query_params.get("dir", "").lower()
     if direction == "up":
         controller.head_up()
     elif direction == "down":
         controller.head_down()
     else:
-        raise HTTPException(status_code=400, detail="invalid dir")
-    return {"ok": True}
+        return _BAD_DIR
+    return _OK_RESP
 
 
 @app.post("/api/lift")
 async def api_lift(request: Request):
-    try:
-        data = await request.json()
-    except Exception:
-        data = {}
-    direction = str(data.get("dir") or "").lower()
+    direction = request.query_params.get("dir", "").lower()
     if direction == "up":
         controller.lift_up()
     elif direction == "down":
         controller.lift_down()
     else:
-        raise HTTPException(status_code=400, detail="invalid dir")
-    return {"ok": True}
+        return _BAD_DIR
+    return _OK_RESP
 
 
 @app.api_route("/api/stop", methods=["POST", "GET"])
 def api_stop():
     controller.stop()
-    return {"ok": True}
+    return _OK_RESP
 
 
 @app.get("/stream")
-def stream():
-    boundary = "frame"
-
-    def gen():
-        # Yield latest frames as MJPEG
-        last_sent = 0
-        while True:
-            frame = controller.get_last_jpeg()
-            if frame and (len(frame) != last_sent):
-                last_sent = len(frame)
+async def stream(request: Request):
+    if mjpeg_server is not None:
+        # Raw mode - let the browser fetch the stream from the dedicated socket server.
+        return RedirectResponse(str(request.url.replace(port=mjpeg_server.port)))
+
+    async def gen():
+        # Yield latest frames as MJPEG straight from the event loop, waking up only when a new one is encoded
+        slot = controller.add_viewer(AsyncFrameSlot(asyncio.get_running_loop()))
+        try:
+            while True:
+                frame = await slot.get()
                 # Send boundary and headers in a small chunk to encourage flush
-                yield b"--" + boundary.encode() + b"\r\n"
-                yield b"Content-Type: image/jpeg\r\n\r\n"
+                yield _BOUNDARY_PREFIX + str(len(frame)).encode() + _HDR_END
                 # Send payload separately to avoid proxy buffering of large combined chunks
                 yield frame
-                yield b"\r\n"
-            else:
-                # Avoid busy loop
-                time.sleep(0.03)
+                yield _TRAILER
+        finally:
+            controller.remove_viewer(slot)
 
     headers = {
         # Strongly discourage any caching or transformation on the path
@@ -354,11 +795,108 @@ def stream():
     }
     return StreamingResponse(
         gen(),
-        media_type=f"multipart/x-mixed-replace; boundary={boundary}",
+        media_type="multipart/x-mixed-replace; boundary=" + _BOUNDARY,
         headers=headers,
     )
 
 
+class _ByteSink:
+    """Write-only file object collecting muxer output between frames."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+@functools.lru_cache(maxsize=None)
+def _h264_available() -> bool:
+    try:
+        av.codec.Codec("libx264", "w")
+    except ValueError:
+        return False
+    return True
+
+
+class H264Encoder:
+    """libx264 encoder producing fragmented MP4, one fragment per frame."""
+
+    def __init__(self):
+        self._sink = _ByteSink()
+        self._container = av.open(
+            self._sink,
+            mode="w",
+            format="mp4",
+            options={"movflags": "empty_moov+default_base_moof+frag_every_frame"},
+        )
+        self._video = None
+        self._start_time = time.monotonic()
+
+    def encode(self, rgb: np.ndarray) -> bytes:
+        """Encode an HxWx3 RGB uint8 array. Returns the muxed output, if any."""
+        if self._video is None:
+            # yuv420p needs even dimensions.
+            height, width = rgb.shape[0] & ~1, rgb.shape[1] & ~1
+            self._video = self._container.add_stream("libx264", rate=_H264_RATE)
+            self._video.width = width
+            self._video.height = height
+            self._video.pix_fmt = "yuv420p"
+            self._video.options = {"tune": "zerolatency", "preset": "ultrafast", "g": str(_H264_RATE)}
+            self._video.codec_context.time_base = Fraction(1, 1000)
+        if rgb.shape[0] != self._video.height or rgb.shape[1] != self._video.width:
+            rgb = np.ascontiguousarray(rgb[:self._video.height, :self._video.width])
+        frame = av.VideoFrame.from_ndarray(rgb, format="rgb24")
+        # Camera frames do not arrive at a fixed rate - timestamp them with wall clock milliseconds.
+        frame.pts = int((time.monotonic() - self._start_time) * 1000)
+        frame.time_base = Fraction(1, 1000)
+        for packet in self._video.encode(frame):
+            self._container.mux(packet)
+        return self._sink.pop()
+
+    def close(self):
+        self._container.close()
+
+
+@app.get("/stream.h264")
+async def stream_h264():
+    if av is None:
+        raise HTTPException(status_code=501, detail="H.264 streaming requires PyAV (pip install av)")
+    if not _h264_available():
+        raise HTTPException(status_code=501, detail="H.264 streaming requires PyAV built with libx264")
+
+    async def gen():
+        # Wait for frames on the event loop, so that Starlette can cancel the generator as soon as the client
+        # disconnects. x264 runs in the threadpool.
+        slot = controller.add_raw_viewer(AsyncFrameSlot(asyncio.get_running_loop()))
+        encoder = H264Encoder()
+        try:
+            while True:
+                rgb = await slot.get()
+                # run_in_threadpool() does not return before the encode finishes, even when cancelled, so close()
+                # below never races with it.
+                data = await run_in_threadpool(encoder.encode, rgb)
+                if data:
+                    yield data
+        finally:
+            controller.remove_viewer(slot)
+            encoder.close()
+
+    headers = {
+        "Cache-Control": "no-cache, no-store, must-revalidate, private",
+        "Pragma": "no-cache",
+        "Expires": "0",
+        "X-Accel-Buffering": "no",
+    }
+    return StreamingResponse(gen(), media_type="video/mp4", headers=headers)
+
+
 # Lifecycle hooks so the app works when started via `uvicorn examples.rc_web:app` as well
 @app.on_event("startup")
 def _on_startup():
@@ -367,10 +905,14 @@ def _on_startup():
 
 @app.on_event("shutdown")
 def _on_shutdown():
+    if mjpeg_server is not None:
+        mjpeg_server.stop()
     controller.disconnect()
 
 
 def main():
+    global mjpeg_server
+
     parser = argparse.ArgumentParser(description="Cozmo RC web server")
     parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
     parser.add_argument("--port", type=int, default=8080, help="Port (default: 8080)")
@@ -381,10 +923,40 @@ def main():
         default=70,
         help="JPEG quality (1-95). Lower = smaller frames (default: 70)",
     )
+    parser.add_argument(
+        "--encode-process",
+        action="store_true",
+        help="Encode JPEG frames in a separate process to keep the web server responsive",
+    )
+    parser.add_argument(
+        "--max-fps",
+        type=float,
+        default=0.0,
+        help="Limit the streamed frame rate; frames above it are dropped before encoding (default: unlimited)",
+    )
+    parser.add_argument(
+        "--max-width",
+        type=int,
+        default=0,
+        help="Downscale frames wider than this many pixels before encoding (default: no scaling)",
+    )
+    parser.add_argument(
+        "--raw-stream-port",
+        type=int,
+        default=0,
+        help="Serve MJPEG from a dedicated socket server on this port; /stream redirects there (default: off)",
+    )
     args = parser.parse_args()
 
     controller._color_camera = bool(args.color)
     controller._jpeg_quality = max(1, min(95, int(args.jpeg_quality)))
+    controller._encode_process = bool(args.encode_process)
+    controller._min_frame_interval = 1.0 / args.max_fps if args.max_fps > 0 else 0.0
+    controller._max_width = max(0, int(args.max_width))
+
+    if args.raw_stream_port:
+        mjpeg_server = MJPEGServer((args.host, args.raw_stream_port), controller)
+        mjpeg_server.start()
 
     # If executed directly, run with uvicorn
     uvicorn.run(app, host=args.host, port=args.port)